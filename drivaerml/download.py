@@ -2,7 +2,7 @@
 # /// script
 # requires-python = ">=3.10"
 # dependencies = [
-#     "requests",
+#     "httpx[http2]",
 #     "tqdm",
 # ]
 # ///
@@ -11,18 +11,22 @@
 Simple, readable script inspired by airfrans/download.py. Edit the constants
 below to configure the owner/prefix, local directory, run IDs, and per-run file
 patterns. For patterns that don't exist directly, the script will attempt
-`.00.part`, `.01.part`, ... and assemble them into the final file.
+`.00.part`, `.01.part`, ... and stream them into the final file.
 
 Run with:
     uv run drivaerml/download.py
 """
 
 from typing import Sequence
-from itertools import count
+from contextlib import asynccontextmanager
+from itertools import accumulate, count
 from pathlib import Path
+import asyncio
+import math
+import os
 import sys
 
-import requests
+import httpx
 from tqdm import tqdm
 
 
@@ -43,8 +47,140 @@ BASE_URL = (
     "https://huggingface.co/datasets/{owner}/{prefix}/resolve/main/{run_dir}/{fname}"
 )
 
+# Files larger than this are downloaded over several parallel Range requests;
+# smaller files aren't worth the extra connections.
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+# Target size of each Range segment.
+SEGMENT_SIZE = 64 * 1024 * 1024
+MAX_SEGMENTS = 8
 
-def _download_stream(url: str, dest: Path | str, description: str) -> bool:
+# How many files to download at once; connection limits are handled by the
+# shared httpx client's limits.
+CONCURRENCY = 4
+
+# How many speculative `.NN.part` HEAD probes to fire at once.
+PROBE_BATCH = 16
+
+# Drop the page cache for downloaded bytes every this many bytes written.
+FADVISE_INTERVAL = 32 * 1024 * 1024
+
+# Transient-error retry policy, mirroring the airfrans session's
+# Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504]).
+# httpx retries nothing by default, so without this one hiccup from the
+# CDN aborts the whole run.
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (502, 503, 504)
+
+
+def _advise_dontneed(fd: int, offset: int = 0, length: int = 0) -> None:
+    """Hint the kernel to drop cached pages for bytes we won't read back.
+
+    These downloads are write-once; without the hint, a multi-GB file
+    fills the page cache with bytes that are never read again, evicting
+    other workloads' pages on small-RAM machines. Advisory only, and a
+    no-op where posix_fadvise is unavailable (Windows/macOS).
+    """
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+
+
+@asynccontextmanager
+async def _stream_with_retries(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs
+):
+    """`client.stream` with retries and backoff on transient server errors."""
+    for attempt in count(0):
+        async with client.stream(method, url, **kwargs) as resp:
+            if resp.status_code in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+                continue
+            yield resp
+            return
+
+
+async def _head_with_retries(client: httpx.AsyncClient, url: str) -> httpx.Response:
+    """`client.head` with retries and backoff on transient server errors."""
+    for attempt in count(0):
+        resp = await client.head(url)
+        if resp.status_code in RETRY_STATUSES and attempt < RETRY_TOTAL:
+            await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+            continue
+        return resp
+
+
+def _supports_ranges(headers) -> bool:
+    """Check whether the server advertises byte-range support."""
+    return headers.get("Accept-Ranges", "").lower() == "bytes"
+
+
+async def _download_ranges(
+    client: httpx.AsyncClient,
+    url: str,
+    dest: Path,
+    total_size: int,
+    description: str,
+    position: int = 0,
+) -> None:
+    """Download a file over several concurrent HTTP Range requests.
+
+    Each task streams one byte range and writes it at its offset via
+    `os.pwrite`, so no locking is needed around the file. The HuggingFace
+    CDN throttles per-connection, so this gives near-linear speedup up to
+    the client's aggregate bandwidth.
+    """
+    n_segments = min(MAX_SEGMENTS, math.ceil(total_size / SEGMENT_SIZE))
+    segment_size = math.ceil(total_size / n_segments)
+
+    # Write into a .partial and only rename on success, so an interrupted
+    # download can't leave a full-size but hole-ridden file at `dest` that
+    # later runs would mistake for complete.
+    partial = dest.with_suffix(dest.suffix + ".partial")
+
+    # Pre-allocate so every task can write at its offset.
+    with open(partial, "wb") as fh:
+        fh.truncate(total_size)
+
+    with tqdm(
+        total=total_size,
+        unit="B",
+        unit_scale=True,
+        unit_divisor=1024,
+        desc=description,
+        position=position,
+        leave=False,
+    ) as pbar:
+
+        async def fetch_segment(start: int) -> None:
+            end = min(start + segment_size, total_size) - 1
+            fd = os.open(partial, os.O_WRONLY)
+            try:
+                async with _stream_with_retries(
+                    client, "GET", url, headers={"Range": f"bytes={start}-{end}"}
+                ) as resp:
+                    resp.raise_for_status()
+                    offset = start
+                    async for chunk in resp.aiter_bytes(1 << 20):
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        pbar.update(len(chunk))
+                _advise_dontneed(fd, start, offset - start)
+            finally:
+                os.close(fd)
+
+        starts = range(0, total_size, segment_size)
+        await asyncio.gather(*(fetch_segment(start) for start in starts))
+
+    partial.rename(dest)
+
+
+async def _download_stream(
+    client: httpx.AsyncClient,
+    url: str,
+    dest: Path | str,
+    description: str,
+    position: int = 0,
+) -> bool:
     """Stream a URL to a file with a progress bar.
 
     Returns True if downloaded; returns False if the server responds 404.
@@ -53,51 +189,156 @@ def _download_stream(url: str, dest: Path | str, description: str) -> bool:
     dest_path = Path(dest)
     dest_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # HEAD to detect 404 early and get size when available
-    try:
-        head = requests.head(url, allow_redirects=True, timeout=30)
-    except Exception as exc:  # fall back to GET without size on HEAD failure
-        print(f"HEAD failed for {url!r}: {exc}", file=sys.stderr)
-        head = None
-
-    if head is not None and head.status_code == 404:
-        return False
-
-    total_size = 0
-    if head is not None and head.status_code == 200:
-        try:
-            total_size = int(head.headers.get("content-length", "0"))
-        except ValueError:
-            total_size = 0
-
-    with requests.get(url, stream=True) as resp:
-        if resp.status_code == 404:
-            return False
-        resp.raise_for_status()
-
-        with (
-            open(dest_path, "wb") as fh,
-            tqdm(
-                total=total_size,
-                unit="B",
-                unit_scale=True,
-                unit_divisor=1024,
-                desc=description,
-            ) as pbar,
-        ):
-            for chunk in resp.iter_content(chunk_size=8192):
-                if chunk:
+    # Resume a previous partial download where possible, rather than
+    # redoing it from byte 0.
+    partial_path = dest_path.with_suffix(dest_path.suffix + ".partial")
+    start = partial_path.stat().st_size if partial_path.exists() else 0
+
+    # A single GET doubles as the 404 probe and the size query: status and
+    # headers arrive before any of the body is consumed. The loop re-issues
+    # the request without a Range header when a resume attempt is refused.
+    while True:
+        headers = {"Range": f"bytes={start}-"} if start else {}
+        async with _stream_with_retries(client, "GET", url, headers=headers) as resp:
+            if resp.status_code == 404:
+                return False
+
+            resumed = (
+                start > 0
+                and resp.status_code == 206
+                and resp.headers.get("Content-Range", "").startswith(
+                    f"bytes {start}-"
+                )
+            )
+            if start and not resumed:
+                # The .partial is stale or already complete (416), or the
+                # server ignored the Range header; drop it and redo from
+                # byte 0 instead of raising on every retry forever.
+                partial_path.unlink(missing_ok=True)
+                start = 0
+                if resp.status_code != 200:
+                    continue
+            resp.raise_for_status()
+
+            try:
+                total_size = int(resp.headers.get("Content-Length", "0"))
+            except ValueError:
+                total_size = 0
+
+            if (
+                not start
+                and total_size > PARALLEL_THRESHOLD
+                and _supports_ranges(resp.headers)
+            ):
+                # Large file on a Range-capable server: leave this response
+                # unread and re-fetch as concurrent segments instead.
+                break
+            with (
+                open(partial_path, "ab" if resumed else "wb") as fh,
+                tqdm(
+                    initial=start,
+                    total=start + total_size,
+                    unit="B",
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=description,
+                    position=position,
+                    leave=False,
+                ) as pbar,
+            ):
+                bytes_since_advise = 0
+                async for chunk in resp.aiter_bytes(1 << 20):
                     fh.write(chunk)
                     if total_size:
                         pbar.update(len(chunk))
-
+                    bytes_since_advise += len(chunk)
+                    if bytes_since_advise >= FADVISE_INTERVAL:
+                        fh.flush()
+                        _advise_dontneed(fh.fileno(), 0, fh.tell())
+                        bytes_since_advise = 0
+                fh.flush()
+                _advise_dontneed(fh.fileno(), 0, fh.tell())
+            partial_path.rename(dest_path)
+            return True
+
+    await _download_ranges(
+        client, url, dest_path, total_size, description, position=position
+    )
     return True
 
 
-def download_direct_or_parts(run_dir: str, fname: str, dest: Path | str) -> None:
+async def _probe_size(client: httpx.AsyncClient, url: str) -> int | None:
+    """Return the Content-Length of `url`, or None if the server responds 404."""
+    head = await _head_with_retries(client, url)
+    if head.status_code == 404:
+        return None
+    head.raise_for_status()
+    try:
+        size = int(head.headers.get("Content-Length", ""))
+    except ValueError:
+        size = 0
+    # A fragment with no usable size can't be placed at an offset; a zero
+    # here would collapse consecutive offsets and make fragments overwrite
+    # each other.
+    if size <= 0:
+        raise RuntimeError(f"No Content-Length reported for {url!r}")
+    return size
+
+
+async def _download_stream_to(
+    client: httpx.AsyncClient, url: str, fd: int, offset: int, pbar: tqdm
+) -> None:
+    """Stream a URL into an already-open file descriptor at a given offset."""
+    start = offset
+    async with _stream_with_retries(client, "GET", url) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_bytes(1 << 20):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+            pbar.update(len(chunk))
+    _advise_dontneed(fd, start, offset - start)
+
+
+async def _discover_parts(
+    client: httpx.AsyncClient, run_dir: str, fname: str
+) -> tuple[list[str], list[int]]:
+    """Find all `.NN.part` fragments of a file and their sizes.
+
+    Probes PROBE_BATCH indices at a time with concurrent HEADs, so a file
+    split into K parts costs ceil(K / PROBE_BATCH) round trips instead of
+    K sequential ones.
+    """
+    part_urls: list[str] = []
+    sizes: list[int] = []
+    for base_idx in count(0, PROBE_BATCH):
+        urls = [
+            BASE_URL.format(
+                owner=HF_OWNER,
+                prefix=HF_PREFIX,
+                run_dir=run_dir,
+                fname=f"{fname}.{part_idx:02d}.part",
+            )
+            for part_idx in range(base_idx, base_idx + PROBE_BATCH)
+        ]
+        results = await asyncio.gather(*(_probe_size(client, u) for u in urls))
+        for part_url, size in zip(urls, results):
+            if size is None:
+                return part_urls, sizes
+            part_urls.append(part_url)
+            sizes.append(size)
+
+
+async def download_direct_or_parts(
+    client: httpx.AsyncClient,
+    run_dir: str,
+    fname: str,
+    dest: Path | str,
+    position: int = 0,
+) -> None:
     """Download a file directly, falling back to `.NN.part` fragments.
 
-    If fragments were downloaded, they are concatenated into the final file.
+    Fragments are streamed concurrently, each directly into its slot of
+    the final file, so no separate part files or assembly pass are needed.
     """
     dest_path = Path(dest)
     if dest_path.exists():
@@ -107,61 +348,104 @@ def download_direct_or_parts(run_dir: str, fname: str, dest: Path | str) -> None
     url = BASE_URL.format(
         owner=HF_OWNER, prefix=HF_PREFIX, run_dir=run_dir, fname=fname
     )
-    if _download_stream(url, dest_path, description=f"{run_dir}/{fname}"):
+    if await _download_stream(
+        client, url, dest_path, description=f"{run_dir}/{fname}", position=position
+    ):
         return
 
-    # Attempt multi-part fallback
-    part_paths: list[Path] = []
-    for part_idx in count(0):
-        part_suffix = f".{part_idx:02d}.part"
-        part_fname = f"{fname}{part_suffix}"
-        part_url = BASE_URL.format(
-            owner=HF_OWNER, prefix=HF_PREFIX, run_dir=run_dir, fname=part_fname
-        )
-        part_path = dest_path.parent / part_fname
-
-        ok = _download_stream(
-            part_url, part_path, description=f"{run_dir}/{part_fname}"
-        )
-        if not ok:
-            break
-        part_paths.append(part_path)
-
-    if not part_paths:
+    # Attempt multi-part fallback: discover fragments and their sizes
+    part_urls, sizes = await _discover_parts(client, run_dir, fname)
+
+    if not part_urls:
         print(f"No remote file or parts found for {dest_path.name}", file=sys.stderr)
         return
 
-    print(f"Assembling {dest_path.name} from {len(part_paths)} parts…")
-    with open(dest_path, "wb") as dst:
-        for part_path in sorted(part_paths):
-            with open(part_path, "rb") as src:
-                while True:
-                    chunk = src.read(64 * 1024)
-                    if not chunk:
-                        break
-                    dst.write(chunk)
-
-    for p in part_paths:
-        p.unlink(missing_ok=True)
-
+    # Pre-size a .partial and stream every fragment straight into its
+    # slot, concurrently; non-overlapping pwrites need no locking. The
+    # rename happens only once every fragment has landed, so an
+    # interrupted run can't leave a complete-looking file behind.
+    total_size = sum(sizes)
+    offsets = list(accumulate([0] + sizes[:-1]))
+    partial_path = dest_path.with_suffix(dest_path.suffix + ".partial")
 
-def process_run(run_idx: int) -> None:
-    """Download all configured files for a single run index."""
-    run_dir = f"run_{run_idx}"
-    run_local_dir = LOCAL_DIR / run_dir
-    run_local_dir.mkdir(parents=True, exist_ok=True)
-
-    for pattern in FILE_PATTERNS:
-        target_name = pattern % run_idx
-        target_path = run_local_dir / target_name
-        download_direct_or_parts(run_dir=run_dir, fname=target_name, dest=target_path)
-
-
-if __name__ == "__main__":
+    fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, total_size)
+        with tqdm(
+            total=total_size,
+            unit="B",
+            unit_scale=True,
+            unit_divisor=1024,
+            desc=f"{run_dir}/{fname}",
+            position=position,
+            leave=False,
+        ) as pbar:
+            await asyncio.gather(
+                *(
+                    _download_stream_to(client, part_url, fd, offset, pbar)
+                    for part_url, offset in zip(part_urls, offsets)
+                )
+            )
+    finally:
+        os.close(fd)
+    partial_path.rename(dest_path)
+
+
+async def main() -> None:
+    """Download all configured files for all runs concurrently."""
     print("Downloading DrivAerML dataset…")
     LOCAL_DIR.mkdir(parents=True, exist_ok=True)
 
-    for i in RUN_IDS:
-        process_run(i)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    # Give each in-flight task its own progress-bar row; without fixed
+    # positions, concurrent tqdm bars interleave into flicker.
+    pbar_slots: asyncio.Queue[int] = asyncio.Queue()
+    for slot in range(CONCURRENCY):
+        pbar_slots.put_nowait(slot)
+
+    # HuggingFace's CDN speaks HTTP/2, so the many HEAD probes and GETs
+    # multiplex over a handful of connections with no per-request TLS
+    # handshake. The transport also retries failed connection attempts.
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    timeout = httpx.Timeout(30.0, read=120.0)
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=limits, retries=RETRY_TOTAL
+    )
+    async with httpx.AsyncClient(
+        transport=transport, follow_redirects=True, timeout=timeout
+    ) as client:
+
+        async def bounded(run_dir: str, fname: str, dest: Path) -> None:
+            async with semaphore:
+                # The semaphore caps in-flight tasks at CONCURRENCY, so a
+                # slot is always free here.
+                position = pbar_slots.get_nowait()
+                try:
+                    await download_direct_or_parts(
+                        client, run_dir, fname, dest, position=position
+                    )
+                finally:
+                    pbar_slots.put_nowait(position)
+
+        tasks = []
+        for run_idx in RUN_IDS:
+            run_dir = f"run_{run_idx}"
+            run_local_dir = LOCAL_DIR / run_dir
+            run_local_dir.mkdir(parents=True, exist_ok=True)
+
+            for pattern in FILE_PATTERNS:
+                target_name = pattern % run_idx
+                tasks.append(
+                    asyncio.create_task(
+                        bounded(run_dir, target_name, run_local_dir / target_name)
+                    )
+                )
+
+        await asyncio.gather(*tasks)
 
     print("Download complete!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())